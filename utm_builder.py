@@ -13,11 +13,14 @@ Optional packaging (after installing pyinstaller):
 
 Author: ChatGPT
 """
+import bisect
+import csv
 import json
 import os
 import sys
 import webbrowser
-from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse, quote_plus
+from collections import deque
+from urllib.parse import urlparse
 
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog, filedialog
@@ -26,15 +29,43 @@ APP_TITLE = "UTM 생성기 - By 재현"
 PRESETS_PATH = os.path.expanduser("~/.utm_builder_presets.json")
 HISTORY_LIMIT = 20
 
-REQUIRED_KEYS = ["utm_source", "utm_medium", "utm_campaign"]
+REQUIRED_KEYS = frozenset(("utm_source", "utm_medium", "utm_campaign"))
 
-GA4_OPTIONAL_KEYS = [
+GA4_OPTIONAL_KEYS = (
     # GA4-extended UTMs (optional)
     "utm_id",
     "utm_source_platform",
     "utm_creative_format",
     "utm_marketing_tactic",
-]
+)
+
+# static widget labels, hoisted so App init iterates constants instead of
+# rebuilding the literal lists each launch
+_CORE_FIELDS = (
+    ("utm_source", "utm_source*"),
+    ("utm_medium", "utm_medium*"),
+    ("utm_campaign", "utm_campaign*"),
+    ("utm_term", "utm_term"),
+    ("utm_content", "utm_content"),
+)
+
+_SPACE_MODE_CHOICES = (
+    ("underscore _", "underscore"),
+    ("dash -", "dash"),
+    ("keep (encode)", "keep"),
+)
+
+# quote_plus rebuilds its quoter cache lazily; precompute the full
+# byte -> encoded-form table once at import so the hot path is a plain
+# list lookup (same chars quote_plus treats as safe)
+_SAFE = frozenset(b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_.-~")
+_QUOTE_PLUS = tuple(
+    chr(b) if b in _SAFE else ("+" if b == 0x20 else "%%%02X" % b)
+    for b in range(256)
+)
+
+def _fast_quote(s, _table=_QUOTE_PLUS):
+    return "".join([_table[b] for b in s.encode("utf-8")])
 
 def load_presets():
     if os.path.exists(PRESETS_PATH):
@@ -47,36 +78,74 @@ def load_presets():
 
 def save_presets(presets):
     try:
-        with open(PRESETS_PATH, "w", encoding="utf-8") as f:
-            json.dump(presets, f, ensure_ascii=False, indent=2)
+        # write compact JSON to a sidecar file, then swap it in atomically
+        # so a crash mid-write can't corrupt the user's presets
+        tmp = PRESETS_PATH + ".tmp"
+        data = json.dumps(presets, ensure_ascii=False, separators=(",", ":"))
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, PRESETS_PATH)
     except Exception as e:
         messagebox.showerror("Error", f"Failed to save presets:\n{e}")
 
-def normalize_pair(k, v, force_lower=False, space_mode="underscore"):
-    def transform(s):
-        if s is None:
-            return s
-        s = s.strip()
-        if force_lower:
-            s = s.lower()
-        if space_mode == "underscore":
-            s = s.replace(" ", "_")
-        elif space_mode == "dash":
-            s = s.replace(" ", "-")
-        # "keep" leaves spaces which will be URL-encoded
+# space replacement per mode; None ("keep") leaves spaces to be URL-encoded
+_SPACE_REPL = {"underscore": "_", "dash": "-", "keep": None}
+
+def _transform(s, force_lower, space_mode):
+    # module-level so normalize_pair doesn't rebuild a closure per call
+    if s is None:
         return s
-    return transform(k), transform(v)
+    s = s.strip()
+    if force_lower:
+        s = s.lower()
+    repl = _SPACE_REPL.get(space_mode)
+    if repl is not None:
+        s = s.replace(" ", repl)
+    return s
 
-def build_utm_url(base_url, pairs, *, force_lower, space_mode, merge_existing=True, override_existing=True):
+def normalize_pair(k, v, force_lower=False, space_mode="underscore"):
+    return _transform(k, force_lower, space_mode), _transform(v, force_lower, space_mode)
+
+def _rebuild_url(parsed, query):
+    # only the query changed, so stitch the URL by hand instead of paying
+    # for parsed._replace (a namedtuple rebuild) plus urlunparse
+    url = parsed.scheme + "://" + parsed.netloc + parsed.path
+    if parsed.params:
+        url += ";" + parsed.params
+    if query:
+        url += "?" + query
+    if parsed.fragment:
+        url += "#" + parsed.fragment
+    return url
+
+def build_utm_url(base_url, pairs, *, force_lower, space_mode, merge_existing=True, override_existing=True, parsed=None):
     if not base_url:
         raise ValueError("Base URL is required.")
-    parsed = urlparse(base_url if "://" in base_url else "https://" + base_url)
+    if parsed is None:
+        parsed = urlparse(base_url if "://" in base_url else "https://" + base_url)
     if not parsed.netloc:
         raise ValueError("Base URL seems invalid. Example: https://example.com/landing")
-    # collect existing query params
+    if not (merge_existing and parsed.query):
+        # fast path for the common case (freshly pasted URL, no query to
+        # merge): skip the split, the dict copy and the override checks
+        parts = []
+        for k, v in pairs.items():
+            if not v:
+                continue
+            nk, nv = normalize_pair(k, v, force_lower, space_mode)
+            if not nk or nv is None or nv == "":
+                continue
+            parts.append(nk + "=" + _fast_quote(nv))
+        return _rebuild_url(parsed, "&".join(parts))
+
+    # collect existing query params; keep them raw (already percent-encoded)
+    # so we never pay parse_qsl's per-field unquote + urlencode's re-quote
     existing = {}
     if merge_existing and parsed.query:
-        for k, v in parse_qsl(parsed.query, keep_blank_values=True):
+        for kv in parsed.query.split("&"):
+            if not kv:
+                continue
+            k, _, v = kv.partition("=")
             existing[k] = v
 
     # apply transforms & build new utm dict
@@ -94,10 +163,45 @@ def build_utm_url(base_url, pairs, *, force_lower, space_mode, merge_existing=Tr
     final = existing.copy()
     final.update(utm)
 
-    # reconstruct URL
-    new_query = urlencode(final, doseq=True, quote_via=quote_plus)
-    rebuilt = parsed._replace(query=new_query)
-    return urlunparse(rebuilt)
+    # reconstruct URL; only the utm pairs need encoding, existing ones pass
+    # through untouched
+    new_query = "&".join(
+        k + "=" + (_fast_quote(v) if k in utm else v)
+        for k, v in final.items()
+    )
+    return _rebuild_url(parsed, new_query)
+
+def build_utm_urls(base_urls, pairs, *, force_lower, space_mode, merge_existing=True, override_existing=True):
+    """Batch variant of build_utm_url for tagging many base URLs with one
+    campaign: the pairs are normalized and percent-encoded once, then the
+    precomputed query suffix is reused for every URL that has no existing
+    query to merge."""
+    utm = {}
+    for k, v in pairs.items():
+        if not v:
+            continue
+        nk, nv = normalize_pair(k, v, force_lower, space_mode)
+        if not nk or nv is None or nv == "":
+            continue
+        utm[nk] = nv
+    suffix = "&".join(nk + "=" + _fast_quote(nv) for nk, nv in utm.items())
+
+    urls = []
+    for base_url in base_urls:
+        if not base_url:
+            raise ValueError("Base URL is required.")
+        parsed = urlparse(base_url if "://" in base_url else "https://" + base_url)
+        if not parsed.netloc:
+            raise ValueError("Base URL seems invalid. Example: https://example.com/landing")
+        if merge_existing and parsed.query:
+            urls.append(build_utm_url(
+                base_url, pairs,
+                force_lower=force_lower, space_mode=space_mode,
+                merge_existing=merge_existing, override_existing=override_existing,
+            ))
+        else:
+            urls.append(_rebuild_url(parsed, suffix))
+    return urls
 
 class App(tk.Tk):
     def __init__(self):
@@ -105,12 +209,36 @@ class App(tk.Tk):
         self.title(APP_TITLE)
         self.geometry("920x680")
         self.minsize(780, 580)
-        self.presets = load_presets()
-        self.history = []
+        # presets load lazily on first use so the disk read + JSON parse
+        # stay off the startup path
+        self._presets = None
+        self._preset_names = []
+        self.history = deque(maxlen=HISTORY_LIMIT)
+        self._history_set = set()
+        # last (base_url, parsed) pair; users hit Generate repeatedly on
+        # the same pasted URL, so skip re-parsing it each time
+        self._parse_cache = (None, None)
 
         self._build_ui()
 
+    @property
+    def presets(self):
+        if self._presets is None:
+            self._presets = load_presets()
+            # kept sorted; updated incrementally so we never re-sort the whole set
+            self._preset_names = sorted(self._presets.keys())
+        return self._presets
+
+    def _populate_preset_combo(self, _event=None):
+        # first open of the combobox triggers the actual load
+        _ = self.presets
+        self.preset_combo.configure(values=self._preset_names)
+
     def _build_ui(self):
+        # stay hidden while ~30 widgets are packed so Tk computes the
+        # window geometry once instead of after every widget
+        self.withdraw()
+
         # Top frame: Base URL
         top = ttk.LabelFrame(self, text="1) 랜딩페이지 URL")
         top.pack(fill="x", padx=12, pady=(12, 8))
@@ -125,22 +253,10 @@ class App(tk.Tk):
         mid = ttk.LabelFrame(self, text="2) UTM 파라미터 입력하기")
         mid.pack(fill="x", padx=12, pady=8)
 
-        self.vars_core = {
-            "utm_source": tk.StringVar(),
-            "utm_medium": tk.StringVar(),
-            "utm_campaign": tk.StringVar(),
-            "utm_term": tk.StringVar(),
-            "utm_content": tk.StringVar(),
-        }
+        self.vars_core = {key: tk.StringVar() for key, _label in _CORE_FIELDS}
 
         row = 0
-        for key, label in [
-            ("utm_source", "utm_source*"),
-            ("utm_medium", "utm_medium*"),
-            ("utm_campaign", "utm_campaign*"),
-            ("utm_term", "utm_term"),
-            ("utm_content", "utm_content"),
-        ]:
+        for key, label in _CORE_FIELDS:
             ttk.Label(mid, text=label).grid(row=row, column=0, padx=8, pady=6, sticky="w")
             ttk.Entry(mid, textvariable=self.vars_core[key], width=40).grid(row=row, column=1, padx=8, pady=6, sticky="we")
             row += 1
@@ -158,6 +274,9 @@ class App(tk.Tk):
             row += 1
         self.adv_frame.grid_columnconfigure(1, weight=1)
 
+        # frozen (key, var) pairs so _collect_pairs skips dict iteration
+        self._all_var_items = tuple(self.vars_core.items()) + tuple(self.vars_adv.items())
+
         # Options frame
         opts = ttk.LabelFrame(self, text="4) 생성기 옵션")
         opts.pack(fill="x", padx=12, pady=8)
@@ -172,15 +291,16 @@ class App(tk.Tk):
         ttk.Checkbutton(opts, text="중복 키 포함 여부", variable=self.override_existing).grid(row=0, column=2, padx=8, pady=6, sticky="w")
 
         ttk.Label(opts, text="공백 처리: ").grid(row=1, column=0, padx=8, pady=6, sticky="e")
-        for i, (label, val) in enumerate([("underscore _", "underscore"), ("dash -", "dash"), ("keep (encode)", "keep")]):
+        for i, (label, val) in enumerate(_SPACE_MODE_CHOICES):
             ttk.Radiobutton(opts, text=label, value=val, variable=self.space_mode).grid(row=1, column=1+i, padx=6, pady=6, sticky="w")
 
         # Presets frame
         presets_frame = ttk.LabelFrame(self, text="5) 프레셋")
         presets_frame.pack(fill="x", padx=12, pady=8)
 
-        self.preset_combo = ttk.Combobox(presets_frame, values=sorted(self.presets.keys()), state="readonly", width=40)
+        self.preset_combo = ttk.Combobox(presets_frame, values=(), state="readonly", width=40)
         self.preset_combo.grid(row=0, column=0, padx=8, pady=8, sticky="w")
+        self.preset_combo.bind("<Button-1>", self._populate_preset_combo)
         ttk.Button(presets_frame, text="프리셋 정보 불러오기", command=self.on_load_preset).grid(row=0, column=1, padx=6, pady=8)
         ttk.Button(presets_frame, text="프리셋 저장", command=self.on_save_preset).grid(row=0, column=2, padx=6, pady=8)
         ttk.Button(presets_frame, text="프리셋 삭제", command=self.on_delete_preset).grid(row=0, column=3, padx=6, pady=8)
@@ -212,27 +332,40 @@ class App(tk.Tk):
         footer = ttk.Frame(self)
         footer.pack(fill="x", padx=12, pady=(0, 12))
         ttk.Label(footer, text="Tip: Required fields marked with *").pack(side="left")
+        self.status_var = tk.StringVar()
+        self._status_after = None
+        ttk.Label(footer, textvariable=self.status_var).pack(side="left", padx=12)
         ttk.Button(footer, text="종료하기", command=self.destroy).pack(side="right")
 
         # macOS menu-ish shortcuts
         self.bind_all("<Command-c>", lambda e: self.on_copy())
         self.bind_all("<Command-Return>", lambda e: self.on_generate())
 
+        self.update_idletasks()
+        self.deiconify()
+
+    def _set_status(self, text):
+        # non-modal confirmation that clears itself; no native alert to
+        # paint and no event loop blocked on a button click
+        if self._status_after is not None:
+            self.after_cancel(self._status_after)
+        self.status_var.set(text)
+        self._status_after = self.after(1500, lambda: self.status_var.set(""))
+
+    def _parsed_base(self, url):
+        cached_url, cached = self._parse_cache
+        if cached_url == url:
+            return cached
+        parsed = urlparse(url if "://" in url else "https://" + url)
+        self._parse_cache = (url, parsed)
+        return parsed
+
     def _collect_pairs(self):
-        pairs = {}
-        for k, var in self.vars_core.items():
-            v = var.get().strip()
-            if v:
-                pairs[k] = v
-        for k, var in self.vars_adv.items():
-            v = var.get().strip()
-            if v:
-                pairs[k] = v
-        return pairs
+        return {k: v for k, var in self._all_var_items if (v := var.get().strip())}
 
     def _validate_required(self, pairs):
-        missing = [rk for rk in REQUIRED_KEYS if not pairs.get(rk)]
-        return missing
+        # set difference runs in C; _collect_pairs already dropped blanks
+        return REQUIRED_KEYS - pairs.keys()
 
     def on_generate(self):
         base = self.base_var.get().strip()
@@ -242,10 +375,10 @@ class App(tk.Tk):
         if missing:
             if not base:
                 # If even base is empty, point it out clearly
-                messagebox.showwarning("Missing", f"Base URL + required fields are needed:\n- Base URL\n- " + ", ".join(REQUIRED_KEYS))
+                messagebox.showwarning("Missing", f"Base URL + required fields are needed:\n- Base URL\n- " + ", ".join(sorted(REQUIRED_KEYS)))
                 return
             else:
-                if not messagebox.askyesno("Proceed?", f"Missing required fields: {', '.join(missing)}\nGenerate anyway?"):
+                if not messagebox.askyesno("Proceed?", f"Missing required fields: {', '.join(sorted(missing))}\nGenerate anyway?"):
                     return
         try:
             url = build_utm_url(
@@ -255,6 +388,7 @@ class App(tk.Tk):
                 space_mode=self.space_mode.get(),
                 merge_existing=self.merge_existing.get(),
                 override_existing=self.override_existing.get(),
+                parsed=self._parsed_base(base) if base else None,
             )
         except Exception as e:
             messagebox.showerror("Error", f"Failed to generate URL:\n{e}")
@@ -274,7 +408,7 @@ class App(tk.Tk):
             self.clipboard_clear()
             self.clipboard_append(url)
             self.update()  # now it stays on macOS after app closes
-            messagebox.showinfo("Copied", "URL copied to clipboard.")
+            self._set_status("URL copied to clipboard.")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to copy:\n{e}")
 
@@ -303,11 +437,13 @@ class App(tk.Tk):
         if not name:
             return
         pairs = self._collect_pairs()
+        if name not in self.presets:
+            bisect.insort(self._preset_names, name)
         self.presets[name] = pairs
         save_presets(self.presets)
-        self.preset_combo.configure(values=sorted(self.presets.keys()))
+        self.preset_combo.configure(values=self._preset_names)
         self.preset_combo.set(name)
-        messagebox.showinfo("Saved", f"Preset '{name}' saved.")
+        self._set_status(f"Preset '{name}' saved.")
 
     def on_load_preset(self):
         name = self.preset_combo.get().strip()
@@ -326,7 +462,7 @@ class App(tk.Tk):
                 self.vars_core[k].set(v)
             elif k in self.vars_adv:
                 self.vars_adv[k].set(v)
-        messagebox.showinfo("Loaded", f"Preset '{name}' loaded.")
+        self._set_status(f"Preset '{name}' loaded.")
 
     def on_delete_preset(self):
         name = self.preset_combo.get().strip()
@@ -335,23 +471,29 @@ class App(tk.Tk):
             return
         if messagebox.askyesno("Delete", f"Delete preset '{name}'?"):
             del self.presets[name]
+            self._preset_names.remove(name)
             save_presets(self.presets)
-            self.preset_combo.configure(values=sorted(self.presets.keys()))
+            self.preset_combo.configure(values=self._preset_names)
             self.preset_combo.set("")
-            messagebox.showinfo("Deleted", f"Preset '{name}' deleted.")
+            self._set_status(f"Preset '{name}' deleted.")
 
     def _add_history(self, url):
-        # De-dup & push to top
-        if url in self.history:
+        # De-dup & push to top; the set gives O(1) membership and the
+        # bounded deque evicts the oldest entry for us. The Listbox is
+        # patched in place instead of cleared and refilled, so each
+        # generate costs O(1) Tk calls.
+        if self.history and self.history[0] == url:
+            return
+        if url in self._history_set:
+            idx = self.history.index(url)
             self.history.remove(url)
-        self.history.insert(0, url)
-        del self.history[HISTORY_LIMIT:]
-        self._refresh_history_listbox()
-
-    def _refresh_history_listbox(self):
-        self.history_list.delete(0, tk.END)
-        for u in self.history:
-            self.history_list.insert(tk.END, u)
+            self.history_list.delete(idx)
+        elif len(self.history) == HISTORY_LIMIT:
+            self._history_set.discard(self.history[-1])
+            self.history_list.delete(tk.END)
+        self.history.appendleft(url)
+        self._history_set.add(url)
+        self.history_list.insert(0, url)
 
     def on_history_double_click(self, _event=None):
         sel = self.history_list.curselection()
@@ -372,11 +514,10 @@ class App(tk.Tk):
         if not path:
             return
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                f.write("url\n")
-                for u in self.history:
-                    # quote for CSV-safe with simple replace (no csv module needed)
-                    f.write('"{}"\n'.format(u.replace('"', '""')))
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                w = csv.writer(f)
+                w.writerow(["url"])
+                w.writerows([u] for u in self.history)
             messagebox.showinfo("Exported", f"History exported to:\n{path}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to export history:\n{e}")